@@ -5,208 +5,665 @@
 # Auteur : Aurel (coordination par Alexandre Willemetz)
 # =====================================================
 
-from fastapi import FastAPI, HTTPException, Request, Query, Body
-from datetime import datetime
+from fastapi import FastAPI, HTTPException, Request, Query, Body, BackgroundTasks, Depends
+from fastapi.responses import ORJSONResponse, Response
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+import asyncio
 import os
+import atexit
+import hmac
 import logging
+import orjson
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from cachetools import TTLCache
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
 
 # =====================================================
 # Initialisation
 # =====================================================
 
-print("=== ENV DEBUG ===")
-print("NOTION_TOKEN:", bool(os.getenv("NOTION_TOKEN")))
-print("AUREL_TOKEN:", bool(os.getenv("AUREL_TOKEN")))
-print("FWK_DB_ID:", os.getenv("FWK_DB_ID"))
-print("=================")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Instantané des variables d'environnement, lu une seule fois au premier appel."""
+    notion_token: str | None
+    aurel_token: bytes
+    dbs: Mapping[str, str | None]
+    dbs_by_env: Mapping[str, str | None]
+    schema_cache_ttl: int
+    notion_pool_size: int
+    warm_schema_on_start: bool
+    max_inflight_per_client: int
+
+
+class DBName(str, Enum):
+    """Noms abrégés des bases Notion acceptés par l'API (validés par FastAPI)."""
+    fwk = "fwk"
+    agent = "agent"
+    module = "module"
+    logs = "logs"
+
+    # Affichage (logs, %s) sous la forme `fwk` et non `DBName.fwk`
+    __str__ = str.__str__
+
+
+# Bases Notion : nom abrégé -> variable d'environnement contenant l'id
+DB_ENV_VARS = {
+    DBName.fwk: "FWK_DB_ID",
+    DBName.agent: "AGENT_DB_ID",
+    DBName.module: "MODULE_DB_ID",
+    DBName.logs: "LOGS_DB_ID",
+}
+
+# Messages d'erreur construits une fois pour toutes
+_DB_NOT_CONFIGURED = {name: f"Base non configurée : {name.value}" for name in DBName}
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Charge `.env` (en local) et l'environnement à la première requête, pas à l'import (Vercel cold start)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    dbs_by_env = {var: os.getenv(var) for var in DB_ENV_VARS.values()}
+    settings = Settings(
+        notion_token=os.getenv("NOTION_TOKEN"),
+        aurel_token=os.getenv("AUREL_TOKEN", "").encode(),
+        dbs=MappingProxyType({name: dbs_by_env[var] for name, var in DB_ENV_VARS.items()}),
+        dbs_by_env=MappingProxyType(dbs_by_env),
+        schema_cache_ttl=int(os.getenv("SCHEMA_CACHE_TTL", "600")),
+        notion_pool_size=int(os.getenv("NOTION_POOL_SIZE", "100")),
+        warm_schema_on_start=os.getenv("WARM_SCHEMA_ON_START", "1") == "1",
+        max_inflight_per_client=int(os.getenv("MAX_INFLIGHT_PER_CLIENT", "10")),
+    )
 
-# Configuration du logger interne
-logging.basicConfig(level=logging.INFO)
+    print("=== ENV DEBUG ===")
+    print("NOTION_TOKEN:", bool(settings.notion_token))
+    print("AUREL_TOKEN:", bool(settings.aurel_token))
+    print("FWK_DB_ID:", settings.dbs[DBName.fwk])
+    print("=================")
+    return settings
+
+
+async def settings_dep() -> Settings:
+    """Dépendance FastAPI : `get_settings` appelé dans la boucle, jamais depuis le threadpool."""
+    return get_settings()
+
+# Configuration du logger interne : les handlers écrivent depuis un thread dédié,
+# jamais depuis la boucle d'événements
+_log_queue = queue.SimpleQueue()
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("Pierre")
 
 # =====================================================
 # Initialisation dynamique du client Notion
 # =====================================================
 
+# Ressources liées à la boucle d'événements qui les a créées : si la boucle change
+# (hébergeur qui exécute chaque invocation dans une nouvelle boucle), elles sont recréées.
+_loop = None
+_http = None
+_notion_sem = None
+
+# Notion limite à ~3 req/s : on borne les appels simultanés pour éviter les rafales de 429
+_NOTION_MAX_CONCURRENCY = 5
+_NOTION_MAX_RETRIES = 3
+# Au-delà, on renvoie le 429 plutôt que de bloquer la requête (et sa place dans le limiteur)
+_NOTION_MAX_RETRY_DELAY = 5.0
+
+
+def _bind_loop():
+    """(Re)crée le client HTTP et le sémaphore Notion pour la boucle courante."""
+    global _loop, _http, _notion_sem
+    loop = asyncio.get_running_loop()
+    if loop is _loop:
+        return
+    import httpx
+    # Les échecs de connexion (aucune requête envoyée) sont réessayés par le transport ;
+    # les 429 sont gérés par `_notion_call`.
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=get_settings().notion_pool_size, max_keepalive_connections=20),
+    )
+    _loop = loop
+    _http = httpx.AsyncClient(transport=transport, timeout=15)
+    _notion_sem = asyncio.Semaphore(_NOTION_MAX_CONCURRENCY)
+
+
+def _http_client():
+    """Client HTTP partagé (keep-alive + HTTP/2) pour réutiliser les connexions TLS vers Notion."""
+    _bind_loop()
+    return _http
+
+
 def get_notion():
-    """Initialise le client Notion dynamiquement (utile pour Vercel cold start)."""
-    from notion_client import Client
-    token = os.getenv("NOTION_TOKEN")
+    """Initialise le client Notion asynchrone au premier appel (utile pour Vercel cold start), puis le réutilise."""
+    return _notion_for(_http_client())
+
+
+@lru_cache(maxsize=1)
+def _notion_for(http):
+    from notion_client import AsyncClient
+    token = get_settings().notion_token
     if not token:
         raise HTTPException(status_code=500, detail="❌ NOTION_TOKEN manquant dans l'environnement")
-    return Client(auth=token)
-
-# Bases Notion
-DB_IDS = {
-    "fwk": os.getenv("FWK_DB_ID"),
-    "agent": os.getenv("AGENT_DB_ID"),
-    "module": os.getenv("MODULE_DB_ID"),
-    "logs": os.getenv("LOGS_DB_ID"),
-}
+    return AsyncClient(auth=token, client=http, timeout_ms=15_000)
+
+
+def _retry_delay(exc) -> float | None:
+    """Délai d'attente lu dans Retry-After (1 s si absent ou illisible) ; None s'il dépasse le plafond."""
+    try:
+        delay = float(exc.headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        delay = 1.0
+    if not delay >= 0:
+        delay = 1.0
+    return delay if delay <= _NOTION_MAX_RETRY_DELAY else None
+
+
+async def _notion_call(call, *args, **kwargs):
+    """Exécute un appel du SDK Notion sous le sémaphore ; réessaie sur 429 en respectant Retry-After."""
+    from notion_client import APIResponseError
+    _bind_loop()
+    for attempt in range(_NOTION_MAX_RETRIES + 1):
+        async with _notion_sem:
+            try:
+                return await call(*args, **kwargs)
+            except APIResponseError as exc:
+                delay = _retry_delay(exc) if exc.status == 429 else None
+                if delay is None or attempt == _NOTION_MAX_RETRIES:
+                    raise
+        logger.warning("Notion 429, nouvel essai dans %ss", delay)
+        await asyncio.sleep(delay)
+
+
+class SchemaEntry(NamedTuple):
+    """Schéma d'une base : propriétés brutes et table {nom: type} dérivée une seule fois."""
+    properties: dict
+    types: dict
+
+
+async def _schema_of(db_id: str) -> SchemaEntry:
+    """Retourne le schéma d'une base Notion."""
+    db_info = await _notion_call(get_notion().databases.retrieve, db_id)
+    properties = db_info["properties"]
+    return SchemaEntry(properties, {k: v["type"] for k, v in properties.items()})
+
+
+_SCHEMA_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+@lru_cache(maxsize=1)
+def _schema_cache() -> TTLCache:
+    """Cache des schémas : les bases Notion changent rarement (TTL 10 min par défaut)."""
+    return TTLCache(maxsize=64, ttl=get_settings().schema_cache_ttl)
+
+
+async def _fetch_schema_into_cache(db_id: str) -> SchemaEntry:
+    schema = await _schema_of(db_id)
+    # Base invalidée pendant l'appel : la tâche n'est plus celle enregistrée, le résultat n'est pas mis en cache
+    if _SCHEMA_INFLIGHT.get(db_id) is asyncio.current_task():
+        _schema_cache()[db_id] = schema
+    return schema
+
+
+def _forget_inflight(db_id: str, task: asyncio.Task):
+    if _SCHEMA_INFLIGHT.get(db_id) is task:
+        del _SCHEMA_INFLIGHT[db_id]
+
+
+def _invalidate_schema(db_id: str | None = None):
+    """Retire un schéma (ou tous) du cache, ainsi que les lectures Notion en cours qui le rempliraient."""
+    if db_id is None:
+        _schema_cache().clear()
+        _SCHEMA_INFLIGHT.clear()
+    else:
+        _schema_cache().pop(db_id, None)
+        _SCHEMA_INFLIGHT.pop(db_id, None)
+
+
+async def _schema_of_cached(db_id: str) -> SchemaEntry:
+    """Version mise en cache de `_schema_of` ; les miss simultanés sur une base partagent le même appel Notion."""
+    schema = _schema_cache().get(db_id)
+    if schema is not None:
+        return schema
+    task = _SCHEMA_INFLIGHT.get(db_id)
+    # Une tâche d'une boucle précédente (fermée) ne se terminera jamais
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(_fetch_schema_into_cache(db_id))
+        _SCHEMA_INFLIGHT[db_id] = task
+        task.add_done_callback(lambda t: _forget_inflight(db_id, t))
+    # shield : l'annulation d'un appelant n'interrompt pas la requête partagée
+    return await asyncio.shield(task)
+
+
+def _utc_now_iso() -> str:
+    """Horodatage UTC ISO 8601 (avec fuseau), calculé une fois par requête."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Propriétés de la base Logs
+_LOG_TITLE_KEY = "Description du changement"
+_LOG_DATE_KEY = "Date du changement"
+
+
+def _log_props(message: str, iso: str) -> dict:
+    """Propriétés Notion d'une entrée de log."""
+    return {
+        _LOG_TITLE_KEY: {"title": [{"text": {"content": message}}]},
+        _LOG_DATE_KEY: {"date": {"start": iso}},
+    }
+
+
+async def _notion_write(background_tasks: BackgroundTasks, sync: bool, call, **kwargs):
+    """Exécute une écriture Notion tout de suite (`sync`) ou après l'envoi de la réponse HTTP."""
+    if sync:
+        return await _notion_call(call, **kwargs)
+    background_tasks.add_task(_notion_call, call, **kwargs)
+    return None
+
+
+async def _archive_pages(notion, page_ids: list[str]) -> list:
+    """Archive plusieurs pages en parallèle (concurrence bornée par le sémaphore Notion) ; un résultat par id."""
+    results = await asyncio.gather(
+        *(_notion_call(notion.pages.update, page_id=pid, archived=True) for pid in page_ids),
+        return_exceptions=True
+    )
+    for pid, res in zip(page_ids, results):
+        if isinstance(res, Exception):
+            logger.error("Échec de l'archivage de la page %s : %s", pid, res)
+    return results
+
 
 # Application FastAPI
 app = FastAPI(
     title="Pierre – Architecte Exécutif du Panthéon",
     version="1.3.1",
-    description="API standardisée pour la gestion des bases Notion (analyse, édition, logs, synchronisation)."
+    description="API standardisée pour la gestion des bases Notion (analyse, édition, logs, synchronisation).",
+    default_response_class=ORJSONResponse
 )
 
+
+@app.on_event("startup")
+async def warm_schema_cache():
+    """Précharge en parallèle le schéma de toutes les bases configurées."""
+    settings = get_settings()
+    if not settings.warm_schema_on_start:
+        return
+    db_ids = [db_id for db_id in settings.dbs.values() if db_id]
+    results = await asyncio.gather(*(_schema_of_cached(db_id) for db_id in db_ids), return_exceptions=True)
+    failed = sum(isinstance(r, BaseException) for r in results)
+    logger.info("Préchargement des schémas : %d/%d bases en cache", len(db_ids) - failed, len(db_ids))
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Ferme proprement le pool de connexions HTTP partagé."""
+    if _http is not None and _loop is asyncio.get_running_loop():
+        await _http.aclose()
+
 # =====================================================
 # Sécurité
 # =====================================================
 
-def verify_token(request: Request):
-    token = request.headers.get("X-Aurel-Token")
-    if token != os.getenv("AUREL_TOKEN"):
+# Dépendances sans I/O déclarées `async def` : FastAPI les exécute dans la boucle
+# plutôt que dans le threadpool (un aller-retour de thread évité par dépendance).
+async def verify_token(request: Request, settings: Settings = Depends(settings_dep)):
+    token = request.headers.get("X-Aurel-Token") or ""
+    if not settings.aurel_token or not hmac.compare_digest(settings.aurel_token, token.encode()):
         raise HTTPException(status_code=403, detail="Token invalide")
     return True
 
+
+class ResolvedDB(NamedTuple):
+    name: DBName
+    id: str
+
+
+def require_db(default=..., description: str = "Nom abrégé de la base"):
+    """Fabrique une dépendance qui valide `?db=` et renvoie la base résolue (400 si non configurée)."""
+    async def dependency(
+        db: DBName = Query(default, description=description),
+        settings: Settings = Depends(settings_dep)
+    ) -> ResolvedDB:
+        db_id = settings.dbs.get(db)
+        if not db_id:
+            raise HTTPException(status_code=400, detail=_DB_NOT_CONFIGURED[db])
+        return ResolvedDB(db, db_id)
+    return dependency
+
+
+async def require_logs_db(settings: Settings = Depends(settings_dep)) -> str:
+    db_id = settings.dbs.get(DBName.logs)
+    if not db_id:
+        raise HTTPException(status_code=500, detail="Base Logs non configurée")
+    return db_id
+
+
+def _client_key(request: Request) -> str:
+    """Identifie un client par son IP : le token, partagé par tous, ne distingue personne."""
+    return get_remote_address(request)
+
+
+# Limiteur de fréquence : chaque log coûte une écriture Notion (~3 req/s max côté Notion).
+# La clé est journalisée par slowapi lors d'un dépassement : rien qui dérive du token.
+limiter = Limiter(key_func=_client_key)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+# Requêtes en cours par client (clé : `_client_key`)
+_INFLIGHT: dict[str, int] = {}
+
+
+def _release_inflight(key: str):
+    if _INFLIGHT[key] <= 1:
+        del _INFLIGHT[key]
+    else:
+        _INFLIGHT[key] -= 1
+
+
+async def _run_then_release(tasks: list, key: str):
+    """Exécute les tâches de fond d'une requête puis libère sa place, même en cas d'échec."""
+    try:
+        for task in tasks:
+            await task()
+    finally:
+        _release_inflight(key)
+
+
+async def concurrency_limit(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    settings: Settings = Depends(settings_dep)
+):
+    """Refuse (429) un client qui a déjà trop de requêtes en cours vers Notion."""
+    key = _client_key(request)
+    count = _INFLIGHT.get(key, 0)
+    if count >= settings.max_inflight_per_client:
+        raise HTTPException(status_code=429, detail="Trop de requêtes simultanées")
+    _INFLIGHT[key] = count + 1
+    deferred = False
+    try:
+        yield
+        # La sortie d'une dépendance `yield` précède les tâches de fond : si la route a
+        # différé des écritures Notion, la place reste réservée jusqu'à leur fin.
+        if background_tasks.tasks:
+            pending = list(background_tasks.tasks)
+            background_tasks.tasks[:] = [BackgroundTask(_run_then_release, pending, key)]
+            deferred = True
+    finally:
+        if not deferred:
+            _release_inflight(key)
+
+
+# Routes d'écriture : token vérifié avant de réserver une place dans le limiteur
+_PROTECTED = [Depends(verify_token), Depends(concurrency_limit)]
+
+# =====================================================
+# Modèles des corps de requête
+# =====================================================
+
+# Propriétés Notion : {nom de la propriété: valeur au format de l'API}
+NotionProperties = dict[str, dict[str, Any]]
+
+
+class BatchItem(BaseModel):
+    db: DBName
+    properties: NotionProperties
+
+
+class UpdateBody(BaseModel):
+    page_id: str
+    fields: NotionProperties
+
 # =====================================================
 # SECTION 1 : ROUTES GET
 # =====================================================
 
+# Réponses statiques précalculées une fois pour toutes
+_HEALTH_STATIC = {"status": "alive", "agent": "Pierre", "version": "1.3.1"}
+_VERSION_PAYLOAD = orjson.dumps({
+    "agent": "Pierre",
+    "version": "1.3.1",
+    "last_update": "2025-11-07T00:00Z"
+})
+
+
 @app.get("/architecte/health")
 async def health():
-    return {
-        "status": "alive",
-        "agent": "Pierre",
-        "version": "1.3.1",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return {**_HEALTH_STATIC, "timestamp": _utc_now_iso()}
 
 
 @app.get("/architecte/version")
 async def version():
-    return {
-        "agent": "Pierre",
-        "version": "1.3.1",
-        "last_update": "2025-11-07T00:00Z"
-    }
+    return Response(content=_VERSION_PAYLOAD, media_type="application/json")
 
 
 @app.get("/architecte/analyse")
-async def analyse(db: str = Query("fwk", description="Nom abrégé de la base (fwk, agent, module...)")):
-    db_id = DB_IDS.get(db)
-    if not db_id:
-        raise HTTPException(status_code=400, detail=f"Base inconnue : {db}")
-
-    logger.info(f"Analyse de la base : {db}")
-    db_info = get_notion().databases.retrieve(db_id)
-    schema = {k: v["type"] for k, v in db_info["properties"].items()}
-    return {"status": "ok", "base": db, "schema": schema}
+async def analyse(
+    target: ResolvedDB = Depends(require_db(DBName.fwk, "Nom abrégé de la base (fwk, agent, module...)"))
+):
+    logger.info("Analyse de la base : %s", target.name)
+    entry = await _schema_of_cached(target.id)
+    return {"status": "ok", "base": target.name, "schema": entry.types}
 
 
 @app.get("/architecte/compare")
 async def compare(
-    db: str = Query("module", description="Base à comparer avec FWK"),
-    ref: str = Query("FWK_DB_ID", description="Nom de la variable d'environnement de référence")
+    target: ResolvedDB = Depends(require_db(DBName.module, "Base à comparer avec FWK")),
+    ref: str = Query("FWK_DB_ID", description="Nom de la variable d'environnement de référence"),
+    settings: Settings = Depends(settings_dep)
 ):
-    base_id = DB_IDS.get(db)
-    ref_id = os.getenv(ref)
-    if not base_id or not ref_id:
+    ref_id = settings.dbs_by_env.get(ref) or os.getenv(ref)
+    if not ref_id:
         raise HTTPException(status_code=400, detail="Base ou référence manquante")
 
-    notion = get_notion()
-    logger.info(f"Comparaison de {db} avec FWK")
-    base_schema = notion.databases.retrieve(base_id)["properties"]
-    ref_schema = notion.databases.retrieve(ref_id)["properties"]
+    logger.info("Comparaison de %s avec FWK", target.name)
+    base_entry, ref_entry = await asyncio.gather(_schema_of_cached(target.id), _schema_of_cached(ref_id))
+    base_schema, ref_schema = base_entry.types, ref_entry.types
 
-    missing = [k for k in ref_schema if k not in base_schema]
-    extra = [k for k in base_schema if k not in ref_schema]
-    type_mismatch = [
-        k for k in base_schema if k in ref_schema and base_schema[k]["type"] != ref_schema[k]["type"]
-    ]
+    missing = sorted(ref_schema.keys() - base_schema.keys())
+    extra = sorted(base_schema.keys() - ref_schema.keys())
+    type_mismatch = sorted(
+        k for k in base_schema.keys() & ref_schema.keys() if base_schema[k] != ref_schema[k]
+    )
 
-    return {"status": "ok", "base": db, "ref_env": ref, "missing": missing, "extra": extra, "type_mismatch": type_mismatch}
+    return {"status": "ok", "base": target.name, "ref_env": ref, "missing": missing, "extra": extra, "type_mismatch": type_mismatch}
 
 # =====================================================
 # SECTION 2 : ROUTES POST
 # =====================================================
 
-@app.post("/architecte/log")
-async def create_log(request: Request, message: str = Body("Log manuel", description="Texte du log à enregistrer")):
-    verify_token(request)
-    db_id = DB_IDS.get("logs")
-    if not db_id:
-        raise HTTPException(status_code=500, detail="Base Logs non configurée")
-
-    logger.info(f"Création d'un log : {message}")
-    notion = get_notion()
-    notion.pages.create(
+@app.post("/architecte/log", dependencies=_PROTECTED)
+@limiter.limit("2/second")
+async def create_log(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    message: str = Body("Log manuel", description="Texte du log à enregistrer"),
+    sync: bool = Query(False, description="Attendre l'écriture Notion avant de répondre"),
+    db_id: str = Depends(require_logs_db)
+):
+    logger.info("Création d'un log : %s", message)
+    await _notion_write(
+        background_tasks, sync, get_notion().pages.create,
         parent={"database_id": db_id},
-        properties={
-            "Description du changement": {"title": [{"text": {"content": message}}]},
-            "Date du changement": {"date": {"start": datetime.utcnow().isoformat()}}
-        }
+        properties=_log_props(message, _utc_now_iso())
     )
-    return {"status": "ok", "message": "log envoyé"}
+    return {"status": "ok", "message": "log envoyé" if sync else "log mis en file d'envoi"}
 
 
-@app.post("/logtest")
-async def logtest(request: Request):
-    verify_token(request)
-    db_id = DB_IDS.get("logs")
-    if not db_id:
-        raise HTTPException(status_code=500, detail="LOGS_DB_ID non trouvé")
-
-    test_message = f"✅ Test LogTest depuis Pierre – {datetime.utcnow().isoformat()}"
-    logger.info(f"[LogTest] Message: {test_message}")
+@app.post("/logtest", dependencies=[Depends(verify_token)])
+@limiter.limit("1/5seconds")
+async def logtest(request: Request, db_id: str = Depends(require_logs_db)):
+    iso = _utc_now_iso()
+    test_message = f"✅ Test LogTest depuis Pierre – {iso}"
+    logger.info("[LogTest] Message: %s", test_message)
 
-    notion = get_notion()
-    notion.pages.create(
+    await _notion_call(
+        get_notion().pages.create,
         parent={"database_id": db_id},
-        properties={
-            "Description du changement": {"title": [{"text": {"content": test_message}}]},
-            "Date du changement": {"date": {"start": datetime.utcnow().isoformat()}}
-        }
+        properties=_log_props(test_message, iso)
     )
     return {"status": "ok", "message": "LogTest réussi"}
 
 
-@app.post("/architecte/edit")
-async def edit_entry(request: Request, db: str = Query(...), data: dict = Body(...)):
-    verify_token(request)
-    db_id = DB_IDS.get(db)
-    if not db_id:
-        raise HTTPException(status_code=400, detail=f"Base inconnue : {db}")
+@app.post("/architecte/edit", dependencies=_PROTECTED)
+async def edit_entry(
+    background_tasks: BackgroundTasks,
+    target: ResolvedDB = Depends(require_db()),
+    data: NotionProperties = Body(...),
+    sync: bool = Query(True, description="Attendre la création pour renvoyer l'id de la page")
+):
+    res = await _notion_write(
+        background_tasks, sync, get_notion().pages.create, parent={"database_id": target.id}, properties=data
+    )
+    return {"status": "ok", "db": target.name, "id": res.get("id") if res else None}
+
+
+_BATCH_MAX_SIZE = 25
+
+
+@app.post("/architecte/batch", dependencies=_PROTECTED)
+async def batch_create(
+    items: list[BatchItem] = Body(..., description="Liste de {db, properties} à créer"),
+    settings: Settings = Depends(settings_dep)
+):
+    if len(items) > _BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Lot trop grand : {_BATCH_MAX_SIZE} éléments maximum")
+
+    resolved = []
+    for index, item in enumerate(items):
+        db_id = settings.dbs.get(item.db)
+        if not db_id:
+            raise HTTPException(status_code=400, detail=f"Élément {index} invalide : {_DB_NOT_CONFIGURED[item.db]}")
+        resolved.append((db_id, item.properties))
 
     notion = get_notion()
-    res = notion.pages.create(parent={"database_id": db_id}, properties=data)
-    return {"status": "ok", "db": db, "id": res.get("id")}
+    results = await asyncio.gather(
+        *(_notion_call(notion.pages.create, parent={"database_id": db_id}, properties=props) for db_id, props in resolved),
+        return_exceptions=True
+    )
+    return {
+        "status": "ok",
+        "results": [
+            {"index": i, "status": "error", "detail": str(res)} if isinstance(res, Exception)
+            else {"index": i, "status": "ok", "id": res.get("id")}
+            for i, res in enumerate(results)
+        ]
+    }
 
 
-@app.post("/architecte/delete")
-async def delete_entry(request: Request, page_id: str = Body(...)):
-    verify_token(request)
-    if not page_id:
+@app.post("/architecte/delete", dependencies=_PROTECTED)
+async def delete_entry(
+    background_tasks: BackgroundTasks,
+    page_id: str | list[str] = Body(..., description="Id de la page, ou liste d'ids à archiver"),
+    sync: bool = Query(False, description="Attendre l'écriture Notion avant de répondre")
+):
+    page_ids = [page_id] if isinstance(page_id, str) else page_id
+    if not page_ids or not all(page_ids):
         raise HTTPException(status_code=400, detail="page_id manquant")
+    if len(page_ids) > _BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Lot trop grand : {_BATCH_MAX_SIZE} éléments maximum")
 
-    get_notion().pages.update(page_id=page_id, archived=True)
-    return {"status": "ok", "message": f"Page {page_id} supprimée"}
+    notion = get_notion()
+    if not sync:
+        background_tasks.add_task(_archive_pages, notion, page_ids)
+        queued = f"Suppression de {page_id} en file" if isinstance(page_id, str) else f"Suppression de {len(page_ids)} pages en file"
+        return {"status": "ok", "message": queued}
+
+    results = await _archive_pages(notion, page_ids)
+    if isinstance(page_id, str):
+        if isinstance(results[0], Exception):
+            raise results[0]
+        return {"status": "ok", "message": f"Page {page_id} supprimée"}
+
+    archived = sum(not isinstance(res, Exception) for res in results)
+    return {
+        "status": "ok",
+        "message": f"{archived}/{len(page_ids)} pages supprimées",
+        "results": [
+            {"index": i, "id": pid, "status": "error", "detail": str(res)} if isinstance(res, Exception)
+            else {"index": i, "id": pid, "status": "ok"}
+            for i, (pid, res) in enumerate(zip(page_ids, results))
+        ]
+    }
 
 
-@app.post("/architecte/update")
-async def update_fields(request: Request, page_id: str = Body(...), fields: dict = Body(...)):
-    verify_token(request)
-    get_notion().pages.update(page_id=page_id, properties=fields)
-    return {"status": "ok", "message": f"Page {page_id} mise à jour"}
+@app.post("/architecte/update", dependencies=_PROTECTED)
+async def update_fields(
+    background_tasks: BackgroundTasks,
+    body: UpdateBody,
+    sync: bool = Query(False, description="Attendre l'écriture Notion avant de répondre")
+):
+    page_id = body.page_id
+    await _notion_write(background_tasks, sync, get_notion().pages.update, page_id=page_id, properties=body.fields)
+    return {"status": "ok", "message": f"Page {page_id} mise à jour" if sync else f"Mise à jour de {page_id} en file"}
 
 
-@app.post("/architecte/sync")
-async def sync_schema(request: Request, db: str = Query("module")):
-    verify_token(request)
-    base_id = DB_IDS.get(db)
-    ref_id = DB_IDS.get("fwk")
-    if not base_id or not ref_id:
+@app.post("/architecte/sync", dependencies=_PROTECTED)
+async def sync_schema(
+    target: ResolvedDB = Depends(require_db(DBName.module)),
+    settings: Settings = Depends(settings_dep)
+):
+    ref_id = settings.dbs.get(DBName.fwk)
+    if not ref_id:
         raise HTTPException(status_code=400, detail="Base ou référence manquante")
 
-    notion = get_notion()
-    base = notion.databases.retrieve(base_id)
-    ref = notion.databases.retrieve(ref_id)
+    base, ref = await asyncio.gather(_schema_of_cached(target.id), _schema_of_cached(ref_id))
+
+    missing_props = sorted(ref.types.keys() - base.types.keys())
+    count = len(missing_props)
+    logger.info("Synchronisation : %d propriétés manquantes détectées dans %s", count, target.name)
+    return {"status": "ok", "base": target.name, "missing_properties": missing_props, "message": f"{count} propriétés manquantes détectées"}
+
+
+@app.post("/architecte/cache/invalidate", dependencies=[Depends(verify_token)])
+async def invalidate_cache(
+    db: DBName | None = Query(None, description="Base dont le schéma doit être rechargé (toutes si absent)"),
+    settings: Settings = Depends(settings_dep)
+):
+    if db is None:
+        _invalidate_schema()
+        return {"status": "ok", "base": None, "message": "Cache des schémas vidé"}
 
-    missing_props = [k for k in ref["properties"] if k not in base["properties"]]
-    logger.info(f"Synchronisation : {len(missing_props)} propriétés manquantes détectées dans {db}")
-    return {"status": "ok", "base": db, "missing_properties": missing_props, "message": f"{len(missing_props)} propriétés manquantes détectées"}
+    db_id = settings.dbs.get(db)
+    if not db_id:
+        raise HTTPException(status_code=400, detail=_DB_NOT_CONFIGURED[db])
+
+    _invalidate_schema(db_id)
+    return {"status": "ok", "base": db, "message": "Cache du schéma invalidé"}
+
+# =====================================================
+# Lancement local
+# =====================================================
+
+if __name__ == "__main__":
+    import uvicorn
+    # `reload` réimporte le module (et vide les caches) : réservé au développement
+    dev = os.getenv("DEV") == "1"
+    uvicorn.run(
+        "pierre:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=1 if dev else int(os.getenv("WEB_CONCURRENCY", "2")),
+        reload=dev,
+    )
 
 # =====================================================
 # Fin du module Pierre
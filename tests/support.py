@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import httpx
+
+os.environ.update(
+    NOTION_TOKEN="notion-test",
+    AUREL_TOKEN="aurel-test",
+    MAX_INFLIGHT_PER_CLIENT="2",
+    WARM_SCHEMA_ON_START="0",
+    FWK_DB_ID="db-fwk",
+    MODULE_DB_ID="db-module",
+)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import pierre  # noqa: E402
+
+HEADERS = {"X-Aurel-Token": "aurel-test"}
+
+
+class FakePages:
+    """Remplace `notion.pages` : chaque mise à jour attend `release` avant de répondre."""
+
+    def __init__(self, fail=False, failing=()):
+        self.release = asyncio.Event()
+        self.updates = []
+        self.creates = []
+        self.fail = fail
+        self.failing = set(failing)
+
+    async def update(self, **kwargs):
+        self.updates.append(kwargs["page_id"])
+        await self.release.wait()
+        if self.fail or kwargs["page_id"] in self.failing:
+            raise RuntimeError("Notion indisponible")
+        return {"id": kwargs["page_id"]}
+
+    async def create(self, **kwargs):
+        self.creates.append(kwargs)
+        if kwargs["parent"]["database_id"] in self.failing:
+            raise RuntimeError("Notion indisponible")
+        return {"id": f"page-{len(self.creates)}"}
+
+
+class FakeDatabases:
+    """Remplace `notion.databases` : chaque lecture attend `release`, puis renvoie `properties`."""
+
+    def __init__(self, properties=None):
+        self.release = asyncio.Event()
+        self.retrieves = []
+        self.properties = properties or {"Name": {"type": "title"}}
+
+    async def retrieve(self, db_id):
+        self.retrieves.append(db_id)
+        await self.release.wait()
+        return {"properties": dict(self.properties)}
+
+
+class FakeNotion:
+    def __init__(self, pages=None, databases=None):
+        self.pages = pages
+        self.databases = databases
+
+
+class PierreTestCase(unittest.IsolatedAsyncioTestCase):
+    """Remplace le client Notion par `FakeNotion` et remet à zéro l'état global de `pierre`."""
+
+    def setUp(self):
+        pierre.get_settings.cache_clear()
+        pierre._schema_cache.cache_clear()
+        pierre._SCHEMA_INFLIGHT.clear()
+        pierre._INFLIGHT.clear()
+        self.pages = FakePages()
+        self.databases = FakeDatabases()
+        self._get_notion = pierre.get_notion
+        pierre.get_notion = lambda: FakeNotion(self.pages, self.databases)
+
+    def tearDown(self):
+        pierre.get_notion = self._get_notion
+        pierre.get_settings.cache_clear()
+        pierre._schema_cache.cache_clear()
+
+    def client(self):
+        transport = httpx.ASGITransport(app=pierre.app, raise_app_exceptions=False)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    async def wait_for(self, predicate):
+        for _ in range(200):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition jamais atteinte")
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from support import HEADERS, PierreTestCase, pierre
+
+
+class ConcurrencyLimitTest(PierreTestCase):
+    async def _update_many(self, client, count, sync=False):
+        return [
+            asyncio.create_task(client.post(
+                "/architecte/update",
+                params={"sync": str(sync).lower()},
+                headers=HEADERS,
+                json={"page_id": f"p{i}", "fields": {}},
+            ))
+            for i in range(count)
+        ]
+
+    async def test_deferred_writes_hold_the_slot(self):
+        async with self.client() as client:
+            tasks = await self._update_many(client, 5)
+            await self.wait_for(lambda: sum(t.done() for t in tasks) == 3)
+
+            rejected = [t.result().status_code for t in tasks if t.done()]
+            self.assertEqual(rejected, [429, 429, 429])
+            self.assertEqual(len(self.pages.updates), 2)
+            self.assertEqual(list(pierre._INFLIGHT.values()), [2])
+
+            self.pages.release.set()
+            responses = await asyncio.gather(*tasks)
+
+        self.assertEqual(sorted(r.status_code for r in responses), [200, 200, 429, 429, 429])
+        self.assertEqual(pierre._INFLIGHT, {})
+
+    async def test_sync_writes_hold_the_slot(self):
+        async with self.client() as client:
+            tasks = await self._update_many(client, 5, sync=True)
+            await self.wait_for(lambda: sum(t.done() for t in tasks) == 3)
+            self.assertEqual(len(self.pages.updates), 2)
+
+            self.pages.release.set()
+            responses = await asyncio.gather(*tasks)
+
+        self.assertEqual(sorted(r.status_code for r in responses), [200, 200, 429, 429, 429])
+        self.assertEqual(pierre._INFLIGHT, {})
+
+    async def test_failed_background_write_releases_the_slot(self):
+        self.pages.fail = True
+        self.pages.release.set()
+        async with self.client() as client:
+            await (await self._update_many(client, 1))[0]
+        self.assertEqual(pierre._INFLIGHT, {})
+
+    async def test_rejected_token_does_not_take_a_slot(self):
+        async with self.client() as client:
+            response = await client.post(
+                "/architecte/update", headers={"X-Aurel-Token": "faux"}, json={"page_id": "p", "fields": {}}
+            )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(pierre._INFLIGHT, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
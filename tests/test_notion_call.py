@@ -0,0 +1,72 @@
+import unittest
+
+import httpx
+from notion_client import APIErrorCode, APIResponseError
+
+from support import PierreTestCase, pierre
+
+
+def api_error(status, retry_after=None):
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    response = httpx.Response(status, headers=headers, text="{}")
+    code = APIErrorCode.RateLimited if status == 429 else APIErrorCode.ValidationError
+    return APIResponseError(response, f"HTTP {status}", code)
+
+
+class FlakyCall:
+    """Lève les erreurs de `errors` une à une, puis réussit."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+class RetryDelayTest(unittest.TestCase):
+    def test_reads_retry_after(self):
+        self.assertEqual(pierre._retry_delay(api_error(429, "2")), 2.0)
+
+    def test_missing_or_unreadable_header_defaults_to_one_second(self):
+        for value in (None, "Wed, 21 Oct 2026 07:28:00 GMT", "nan", "-3"):
+            with self.subTest(value=value):
+                self.assertEqual(pierre._retry_delay(api_error(429, value)), 1.0)
+
+    def test_delay_above_the_cap_is_refused(self):
+        self.assertIsNone(pierre._retry_delay(api_error(429, "60")))
+        self.assertIsNone(pierre._retry_delay(api_error(429, "inf")))
+
+
+class NotionCallRetryTest(PierreTestCase):
+    async def test_retries_429_then_succeeds(self):
+        call = FlakyCall(api_error(429, "0"), api_error(429, "0"))
+        self.assertEqual(await pierre._notion_call(call), {"ok": True})
+        self.assertEqual(call.calls, 3)
+
+    async def test_gives_up_after_max_retries(self):
+        call = FlakyCall(*[api_error(429, "0")] * (pierre._NOTION_MAX_RETRIES + 1))
+        with self.assertRaises(APIResponseError) as ctx:
+            await pierre._notion_call(call)
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertEqual(call.calls, pierre._NOTION_MAX_RETRIES + 1)
+
+    async def test_long_retry_after_raises_the_429_at_once(self):
+        call = FlakyCall(api_error(429, "60"))
+        with self.assertRaises(APIResponseError) as ctx:
+            await pierre._notion_call(call)
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertEqual(call.calls, 1)
+
+    async def test_other_errors_are_not_retried(self):
+        call = FlakyCall(api_error(400))
+        with self.assertRaises(APIResponseError):
+            await pierre._notion_call(call)
+        self.assertEqual(call.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from support import HEADERS, PierreTestCase, pierre
+
+
+class SchemaCoalescingTest(PierreTestCase):
+    async def test_concurrent_misses_share_one_notion_call(self):
+        tasks = [asyncio.create_task(pierre._schema_of_cached("db-fwk")) for _ in range(5)]
+        await self.wait_for(lambda: len(self.databases.retrieves) == 1)
+        self.databases.release.set()
+        entries = await asyncio.gather(*tasks)
+
+        self.assertEqual(self.databases.retrieves, ["db-fwk"])
+        self.assertTrue(all(entry is entries[0] for entry in entries))
+        self.assertEqual(entries[0].types, {"Name": "title"})
+        self.assertEqual(pierre._SCHEMA_INFLIGHT, {})
+
+        self.assertIs(await pierre._schema_of_cached("db-fwk"), entries[0])
+        self.assertEqual(len(self.databases.retrieves), 1)
+
+    async def test_cancelled_caller_does_not_cancel_the_shared_fetch(self):
+        first = asyncio.create_task(pierre._schema_of_cached("db-fwk"))
+        second = asyncio.create_task(pierre._schema_of_cached("db-fwk"))
+        await self.wait_for(lambda: len(self.databases.retrieves) == 1)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.databases.release.set()
+
+        self.assertEqual((await second).types, {"Name": "title"})
+        self.assertIn("db-fwk", pierre._schema_cache())
+        self.assertEqual(len(self.databases.retrieves), 1)
+
+    async def test_fetch_left_on_another_loop_is_ignored(self):
+        old_loop = asyncio.new_event_loop()
+        try:
+            pierre._SCHEMA_INFLIGHT["db-fwk"] = old_loop.create_future()
+            self.databases.release.set()
+            entry = await asyncio.wait_for(pierre._schema_of_cached("db-fwk"), timeout=1)
+        finally:
+            old_loop.close()
+        self.assertEqual(entry.types, {"Name": "title"})
+        self.assertEqual(self.databases.retrieves, ["db-fwk"])
+
+
+class SchemaInvalidationTest(PierreTestCase):
+    async def _start_fetch(self, db_id="db-fwk"):
+        task = asyncio.create_task(pierre._schema_of_cached(db_id))
+        await self.wait_for(lambda: len(self.databases.retrieves) == 1)
+        return task
+
+    async def test_invalidate_during_fetch_does_not_cache_stale_schema(self):
+        task = await self._start_fetch()
+        async with self.client() as client:
+            response = await client.post("/architecte/cache/invalidate", params={"db": "fwk"}, headers=HEADERS)
+        self.assertEqual(response.status_code, 200)
+
+        self.databases.release.set()
+        await task
+        self.assertNotIn("db-fwk", pierre._schema_cache())
+        self.assertEqual(pierre._SCHEMA_INFLIGHT, {})
+
+    async def test_clear_all_drops_fetches_in_flight(self):
+        task = await self._start_fetch()
+        pierre._invalidate_schema()
+        self.databases.release.set()
+        await task
+        self.assertEqual(len(pierre._schema_cache()), 0)
+
+    async def test_stale_fetch_does_not_unregister_its_successor(self):
+        stale = await self._start_fetch()
+        pierre._invalidate_schema("db-fwk")
+        fresh = asyncio.create_task(pierre._schema_of_cached("db-fwk"))
+        await self.wait_for(lambda: len(self.databases.retrieves) == 2)
+        registered = pierre._SCHEMA_INFLIGHT["db-fwk"]
+
+        self.databases.release.set()
+        await stale
+        await fresh
+        self.assertIsNot(registered, stale)
+        self.assertIn("db-fwk", pierre._schema_cache())
+        self.assertEqual(pierre._SCHEMA_INFLIGHT, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
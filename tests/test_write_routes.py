@@ -0,0 +1,81 @@
+import unittest
+
+from support import HEADERS, PierreTestCase, pierre
+
+
+class BatchCreateTest(PierreTestCase):
+    async def test_reports_results_per_index(self):
+        self.pages.failing = {"db-fwk"}
+        items = [
+            {"db": "module", "properties": {}},
+            {"db": "fwk", "properties": {}},
+            {"db": "module", "properties": {}},
+        ]
+        async with self.client() as client:
+            response = await client.post("/architecte/batch", headers=HEADERS, json=items)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertEqual([r["status"] for r in results], ["ok", "error", "ok"])
+        self.assertEqual(results[1]["detail"], "Notion indisponible")
+        self.assertEqual(len(self.pages.creates), 3)
+
+    async def test_rejects_oversized_batch(self):
+        items = [{"db": "module", "properties": {}}] * (pierre._BATCH_MAX_SIZE + 1)
+        async with self.client() as client:
+            response = await client.post("/architecte/batch", headers=HEADERS, json=items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.pages.creates, [])
+
+    async def test_rejects_unconfigured_db_before_writing(self):
+        items = [{"db": "module", "properties": {}}, {"db": "agent", "properties": {}}]
+        async with self.client() as client:
+            response = await client.post("/architecte/batch", headers=HEADERS, json=items)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Élément 1", response.json()["detail"])
+        self.assertEqual(self.pages.creates, [])
+
+
+class DeleteEntryTest(PierreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pages.release.set()
+        self.pages.failing = {"bad"}
+
+    async def _delete(self, page_id, sync=True):
+        async with self.client() as client:
+            return await client.post(
+                "/architecte/delete", params={"sync": str(sync).lower()}, headers=HEADERS, json=page_id
+            )
+
+    async def test_list_reports_partial_failure_per_id(self):
+        response = await self._delete(["p1", "bad", "p2"])
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["message"], "2/3 pages supprimées")
+        self.assertEqual(
+            [(r["index"], r["id"], r["status"]) for r in body["results"]],
+            [(0, "p1", "ok"), (1, "bad", "error"), (2, "p2", "ok")],
+        )
+        self.assertEqual(sorted(self.pages.updates), ["bad", "p1", "p2"])
+
+    async def test_single_id_failure_is_an_error(self):
+        response = await self._delete("bad")
+        self.assertEqual(response.status_code, 500)
+
+    async def test_rejects_oversized_list(self):
+        response = await self._delete([f"p{i}" for i in range(pierre._BATCH_MAX_SIZE + 1)], sync=False)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.pages.updates, [])
+
+    async def test_deferred_list_archives_every_page(self):
+        response = await self._delete(["p1", "bad", "p2"], sync=False)
+        self.assertEqual(response.json()["message"], "Suppression de 3 pages en file")
+        self.assertEqual(sorted(self.pages.updates), ["bad", "p1", "p2"])
+        self.assertEqual(pierre._INFLIGHT, {})
+
+
+if __name__ == "__main__":
+    unittest.main()